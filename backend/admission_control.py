@@ -0,0 +1,242 @@
+# backend/admission_control.py
+import os
+import queue
+import threading
+import time
+from typing import Callable, Dict, List, Optional, Tuple
+
+
+class AdmissionRejected(Exception):
+    """Raised when a report submission is refused (rate limit / queue full)"""
+
+    def __init__(self, status: int, message: str, retry_after: float):
+        super().__init__(message)
+        self.status = status
+        self.message = message
+        self.retry_after = max(1, int(retry_after + 0.999))
+
+
+class IngestionFailed(Exception):
+    """Raised when an admitted report could not be processed"""
+
+
+class TokenBucket:
+    """Token bucket refilled at `rate` tokens/second, holding at most `capacity`"""
+
+    def __init__(self, rate: float, capacity: float):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+
+    def consume(self, now: float) -> float:
+        """Take one token. Returns 0 if admitted, else seconds until the next token."""
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+        if self.tokens >= 1:
+            self.tokens -= 1
+            return 0.0
+        return (1 - self.tokens) / self.rate
+
+    def is_idle(self, now: float) -> bool:
+        """True once the bucket would be full again (safe to forget)"""
+        return self.tokens + (now - self.updated) * self.rate >= self.capacity
+
+
+class _IngestionJob:
+    """One accepted submission waiting for the ingestion worker"""
+
+    def __init__(self, key: Tuple[str, str], func: Callable[[], Dict]):
+        self.key = key
+        self.func = func
+        self.done = threading.Event()
+        self.result: Optional[Dict] = None
+        self.error: Optional[Exception] = None
+
+
+class ReportAdmissionController:
+    """Admission control for POST /report.
+
+    Every submission goes through, in order:
+      1. per-client token bucket - `rate_per_minute` with bursts of `burst`
+         (429 + Retry-After when empty), charged for duplicates too
+      2. duplicate suppression - same (client, location) within `dedup_window`
+         seconds gets the original result back right away instead of a new
+         report (or "still queued" if the original hasn't finished)
+      3. bounded ingestion queue of `queue_size` slots (503 + Retry-After when full)
+
+    A single worker drains the queue, runs each job (geocode + add in memory)
+    and then calls `on_batch` (one save of the reports file and one hotspot
+    recompute) once per drained batch rather than once per report. If
+    `on_batch` fails, every job in the batch is reported as failed.
+
+    Up to `queue_size` jobs can be queued while another `queue_size` are being
+    processed, so waiting on every job could park 2 x queue_size request
+    threads. Instead at most `max_waiters` (default `queue_size`) requests
+    block for their result (up to `wait_timeout`); any admitted beyond that
+    return "queued" (202) immediately. Read endpoints never touch the queue,
+    so a write flood holds at most `max_waiters` request threads.
+    """
+
+    def __init__(self,
+                 rate_per_minute: float = float(os.getenv("REPORT_RATE_PER_MIN", "6")),
+                 burst: int = int(os.getenv("REPORT_BURST", "3")),
+                 queue_size: int = int(os.getenv("REPORT_QUEUE_SIZE", "32")),
+                 dedup_window: float = float(os.getenv("REPORT_DEDUP_SECONDS", "120")),
+                 wait_timeout: float = float(os.getenv("REPORT_WAIT_SECONDS", "30")),
+                 max_waiters: Optional[int] = None):
+        self.rate = rate_per_minute / 60.0
+        self.burst = burst
+        self.queue_size = queue_size
+        self.dedup_window = dedup_window
+        self.wait_timeout = wait_timeout
+        self.max_waiters = queue_size if max_waiters is None else max_waiters
+
+        self.on_batch: Optional[Callable[[], object]] = None
+
+        self._lock = threading.Lock()
+        self._buckets: Dict[str, TokenBucket] = {}
+        self._recent: Dict[Tuple[str, str], Tuple[float, _IngestionJob]] = {}
+        self._queue: "queue.Queue[_IngestionJob]" = queue.Queue(maxsize=queue_size)
+        self._worker: Optional[threading.Thread] = None
+        self._waiting = 0  # request threads currently blocked in submit()
+        # Rough per-job service time, used to size Retry-After when the queue is full
+        self._avg_job_seconds = 1.0
+
+    # ---------- admission checks ----------
+
+    def _check_rate(self, client_id: str, now: float):
+        bucket = self._buckets.get(client_id)
+        if bucket is None:
+            if len(self._buckets) > 10000:
+                self._buckets = {k: b for k, b in self._buckets.items() if not b.is_idle(now)}
+            bucket = self._buckets[client_id] = TokenBucket(self.rate, self.burst)
+
+        wait = bucket.consume(now)
+        if wait > 0:
+            raise AdmissionRejected(429, "Too many reports, slow down", wait)
+
+    def _find_duplicate(self, key: Tuple[str, str], now: float) -> Optional[_IngestionJob]:
+        if len(self._recent) > 10000:
+            cutoff = now - self.dedup_window
+            self._recent = {k: v for k, v in self._recent.items() if v[0] >= cutoff}
+
+        entry = self._recent.get(key)
+        if entry and now - entry[0] < self.dedup_window:
+            return entry[1]
+        return None
+
+    # ---------- ingestion ----------
+
+    def _ensure_worker(self):
+        if self._worker is None or not self._worker.is_alive():
+            self._worker = threading.Thread(target=self._run, daemon=True)
+            self._worker.start()
+
+    def _fail(self, job: _IngestionJob, error: Exception):
+        job.error = error
+        # Don't let a failure be replayed to retries as a duplicate
+        with self._lock:
+            entry = self._recent.get(job.key)
+            if entry and entry[1] is job:
+                del self._recent[job.key]
+
+    def _run(self):
+        while True:
+            batch: List[_IngestionJob] = [self._queue.get()]
+            while True:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+
+            started = time.monotonic()
+            for job in batch:
+                try:
+                    job.result = job.func()
+                except Exception as e:
+                    print(f"❌ Report ingestion error: {e}")
+                    self._fail(job, e)
+
+            # Save + refresh once for the whole batch, before anyone is released
+            if self.on_batch is not None:
+                try:
+                    self.on_batch()
+                except Exception as e:
+                    print(f"❌ Batch save/refresh error: {e}")
+                    for job in batch:
+                        if job.error is None:
+                            self._fail(job, e)
+
+            elapsed = (time.monotonic() - started) / len(batch)
+            self._avg_job_seconds = 0.8 * self._avg_job_seconds + 0.2 * elapsed
+
+            for job in batch:
+                job.done.set()
+                self._queue.task_done()
+
+    def submit(self, client_id: str, location: str, func: Callable[[], Dict]) -> Tuple[Optional[Dict], bool]:
+        """Admit and run `func` through the ingestion queue.
+
+        Returns (result, duplicate). `result` is None if the job is still
+        queued after `wait_timeout` seconds, if all `max_waiters` slots are
+        busy, or for a duplicate whose original hasn't finished yet. Raises AdmissionRejected or IngestionFailed.
+        """
+        key = (client_id, location.strip().lower())
+        now = time.monotonic()
+
+        with self._lock:
+            self._check_rate(client_id, now)
+
+            job = self._find_duplicate(key, now)
+            duplicate = job is not None
+
+            if not duplicate:
+                job = _IngestionJob(key, func)
+                try:
+                    self._queue.put_nowait(job)
+                except queue.Full:
+                    raise AdmissionRejected(503, "Report queue is full, try again later",
+                                            self._avg_job_seconds * self.queue_size)
+                self._recent[key] = (now, job)
+                self._ensure_worker()
+
+        if duplicate:
+            # Never park a request thread on someone else's job
+            return (job.result if job.done.is_set() else None), True
+
+        # Only a bounded number of request threads may block on a result
+        with self._lock:
+            if self._waiting >= self.max_waiters:
+                return None, False
+            self._waiting += 1
+        try:
+            finished = job.done.wait(self.wait_timeout)
+        finally:
+            with self._lock:
+                self._waiting -= 1
+
+        if not finished:
+            return None, False
+        if job.error is not None:
+            raise IngestionFailed(str(job.error))
+        return job.result, False
+
+    def drain(self):
+        """Block until every admitted job has been processed"""
+        self._queue.join()
+
+    def stats(self) -> Dict:
+        """Current admission state (for monitoring)"""
+        return {
+            "queued": self._queue.qsize(),
+            "queue_size": self.queue_size,
+            "waiting": self._waiting,
+            "tracked_clients": len(self._buckets),
+            "avg_job_seconds": round(self._avg_job_seconds, 3)
+        }
+
+
+# Singleton instance
+admission = ReportAdmissionController()
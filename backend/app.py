@@ -2,8 +2,11 @@
 from flask import Flask, jsonify, request
 from flask_cors import CORS
 from predictive_engine import predictor
-from user_reports import report_manager
+from user_reports import report_manager, MODERATION_ACTIONS
+from admission_control import admission, AdmissionRejected, IngestionFailed
+from models import HotspotRecord, RiskLevel, Source
 from datetime import datetime, timedelta
+import hmac
 import json
 import threading
 import time
@@ -28,12 +31,25 @@ current_data = {
     "user_reports": []
 }
 
+# ((hotspots list, user reports list), serialized JSON) - /hotspots body is built once per update
+_hotspots_json_cache = (None, None)
+
+# Shared secret for moderation endpoints (moderation is disabled when unset)
+MODERATION_TOKEN = os.getenv("MODERATION_TOKEN", "")
+
+# Serialises recomputes between the background updater and report ingestion
+update_lock = threading.Lock()
+
 def get_real_rainfall():
     """Get ACTUAL rainfall data"""
     return predictor.get_real_rainfall_data()
 
 def update_hotspots():
     """Update hotspots based on current conditions"""
+    with update_lock:
+        return _update_hotspots()
+
+def _update_hotspots():
     global current_data
     
     # Get REAL rainfall
@@ -43,56 +59,33 @@ def update_hotspots():
     # Get predictions for all areas
     predictions = predictor.get_predictions_for_all_areas(rainfall_mm)
     
-    # Convert to hotspot format
+    # Convert to hotspot records (dicts are only built when serialized)
+    now_ts = time.time()
     hotspots = []
     for i, pred in enumerate(predictions[:10], 1):  # Top 10 areas
-        hotspot = {
-            "id": i,
-            "ward_name": pred["area"],
-            "ward_code": pred["area"][:2].upper(),
-            "latitude": predictor.delhi_topography.get(pred["area"], {}).get("lat", 28.6 + random.random()*0.1),
-            "longitude": predictor.delhi_topography.get(pred["area"], {}).get("lon", 77.2 + random.random()*0.1),
-            "risk_level": pred["risk_level"],
-            "severity_score": pred["severity_score"],
-            "last_incident": pred.get("last_incident", ""),
-            "rainfall_mm": round(rainfall_mm, 1),
-            "drainage_status": self._get_drainage_text(pred["area"]),
-            "preparedness_score": pred["preparedness_score"],
-            "prediction_confidence": pred["confidence"],
-            "will_waterlog": pred["will_waterlog"],
-            "last_updated": datetime.now().isoformat(),
-            "data_source": "predictive_engine"
-        }
-        
-        # Add elevation data if available
-        if pred["area"] in predictor.delhi_topography:
-            hotspot["elevation_m"] = predictor.delhi_topography[pred["area"]]["elevation"]
-        
+        area_data = predictor.delhi_topography.get(pred["area"], {})
+        hotspot = HotspotRecord(
+            id=i,
+            ward_name=pred["area"],
+            ward_code=pred["area"][:2].upper(),
+            latitude=area_data.get("lat", 28.6 + random.random()*0.1),
+            longitude=area_data.get("lon", 77.2 + random.random()*0.1),
+            risk_level=RiskLevel(pred["risk_level"]),
+            severity_score=pred["severity_score"],
+            last_incident=pred.get("last_incident", ""),
+            rainfall_mm=round(rainfall_mm, 1),
+            drainage_status=_get_drainage_text(pred["area"]),
+            preparedness_score=pred["preparedness_score"],
+            prediction_confidence=pred["confidence"],
+            will_waterlog=pred["will_waterlog"],
+            last_updated_ts=now_ts,
+            source=Source.PREDICTIVE_ENGINE,
+            elevation_m=area_data.get("elevation")  # Add elevation data if available
+        )
         hotspots.append(hotspot)
     
-    # Add user-reported hotspots
+    # User-reported hotspots are the report records themselves, serialized on output
     user_reports = report_manager.get_active_reports(24)  # Last 24 hours
-    for report in user_reports:
-        hotspot = {
-            "id": len(hotspots) + 1,
-            "ward_name": report["location"],
-            "ward_code": "UR",  # User Reported
-            "latitude": report["latitude"],
-            "longitude": report["longitude"],
-            "risk_level": "High" if "High" in report["severity"] else "Medium",
-            "severity_score": 8 if "High" in report["severity"] else 5,
-            "last_incident": report["reported_at"][:10],
-            "rainfall_mm": rainfall_mm,
-            "drainage_status": "Unknown",
-            "preparedness_score": 3,
-            "prediction_confidence": 70,
-            "will_waterlog": True,
-            "last_updated": report["reported_at"],
-            "data_source": "user_report",
-            "report_id": report["report_id"],
-            "description": report.get("description", "")
-        }
-        hotspots.append(hotspot)
     
     current_data["hotspots"] = hotspots
     current_data["rainfall"] = rainfall_data
@@ -103,16 +96,38 @@ def update_hotspots():
     if datetime.now().minute == 0:  # On the hour
         with open("data.json", "w") as f:
             json.dump({
-                "hotspots": hotspots,
+                "hotspots": _hotspot_dicts(hotspots, user_reports, rainfall_mm),
                 "rainfall": rainfall_data,
                 "last_updated": datetime.now().isoformat()
             }, f, indent=2)
     
     print(f"✅ Updated at {datetime.now().strftime('%H:%M:%S')}")
-    print(f"🌧️ Rainfall: {rainfall_mm}mm | High risk areas: {len([h for h in hotspots if h['risk_level']=='High'])}")
+    print(f"🌧️ Rainfall: {rainfall_mm}mm | High risk areas: {len(_high_risk_names(hotspots, user_reports))}")
     
     return True
 
+def _hotspot_dicts(hotspots, user_reports, rainfall_mm):
+    """Predicted hotspots followed by user reports (IDs continue after the predictions)"""
+    data = [hotspot.to_dict() for hotspot in hotspots]
+    for hotspot_id, report in enumerate(user_reports, len(hotspots) + 1):
+        data.append(report.to_hotspot_dict(hotspot_id, rainfall_mm))
+    return data
+
+def serialize_hotspots(hotspots=None, user_reports=None):
+    """JSON body for /hotspots (uncached; defaults to the current snapshot)"""
+    if hotspots is None:
+        hotspots = current_data["hotspots"]
+    if user_reports is None:
+        user_reports = current_data["user_reports"]
+    rainfall_mm = current_data["rainfall"].get("rainfall_mm", 0)
+    return app.json.dumps(_hotspot_dicts(hotspots, user_reports, rainfall_mm))
+
+def _high_risk_names(hotspots, user_reports):
+    """Ward names / report locations of all high risk hotspots"""
+    names = [h.ward_name for h in hotspots if h.risk_level is RiskLevel.HIGH]
+    names.extend(r.location for r in user_reports if r.risk_level is RiskLevel.HIGH)
+    return names
+
 def _get_drainage_text(area):
     """Convert drainage score to text"""
     if area in predictor.delhi_topography:
@@ -127,6 +142,13 @@ def _get_drainage_text(area):
             return "Weak"
     return "Unknown"
 
+def _ingest_batch():
+    """One durable save and one hotspot refresh per batch of new reports"""
+    report_manager.save_reports()
+    update_hotspots()
+
+admission.on_batch = _ingest_batch
+
 # Background updater - updates based on REAL rainfall patterns
 def start_real_updater():
     def run():
@@ -164,23 +186,36 @@ def home():
             "Delhi rainfall pattern analysis",
             "Historical incident correlation"
         ],
-        "last_update": current_data["hotspots"][0]["last_updated"] if current_data["hotspots"] else "Never"
+        "last_update": current_data["hotspots"][0].to_dict()["last_updated"] if current_data["hotspots"] else "Never"
     })
 
 @app.route('/hotspots')
 def get_hotspots():
-    return jsonify(current_data["hotspots"])
+    global _hotspots_json_cache
+    hotspots = current_data["hotspots"]
+    user_reports = current_data["user_reports"]
+    cached_lists, body = _hotspots_json_cache
+    if cached_lists is None or cached_lists[0] is not hotspots or cached_lists[1] is not user_reports:
+        body = serialize_hotspots(hotspots, user_reports)
+        _hotspots_json_cache = ((hotspots, user_reports), body)
+    return app.response_class(body, mimetype="application/json")
 
 @app.route('/hotspot/<int:hotspot_id>')
 def get_hotspot(hotspot_id):
-    for hotspot in current_data["hotspots"]:
-        if hotspot["id"] == hotspot_id:
-            # Add detailed prediction info
-            if hotspot["ward_name"] in predictor.delhi_topography:
-                area_data = predictor.delhi_topography[hotspot["ward_name"]]
-                hotspot["elevation"] = area_data["elevation"]
-                hotspot["drainage_score"] = area_data["drainage_score"]
-            return jsonify(hotspot)
+    hotspots = current_data["hotspots"]
+    user_reports = current_data["user_reports"]
+    # IDs are assigned sequentially from 1, user reports continue after predictions
+    if len(hotspots) < hotspot_id <= len(hotspots) + len(user_reports):
+        report = user_reports[hotspot_id - len(hotspots) - 1]
+        return jsonify(report.to_hotspot_dict(hotspot_id, current_data["rainfall"].get("rainfall_mm", 0)))
+    if 1 <= hotspot_id <= len(hotspots) and hotspots[hotspot_id - 1].id == hotspot_id:
+        hotspot = hotspots[hotspot_id - 1].to_dict()
+        # Add detailed prediction info
+        if hotspot["ward_name"] in predictor.delhi_topography:
+            area_data = predictor.delhi_topography[hotspot["ward_name"]]
+            hotspot["elevation"] = area_data["elevation"]
+            hotspot["drainage_score"] = area_data["drainage_score"]
+        return jsonify(hotspot)
     return jsonify({"error": "Not found"}), 404
 
 @app.route('/predictions')
@@ -198,7 +233,7 @@ def get_predictions():
 
 @app.route('/high-risk-areas')
 def get_high_risk_areas():
-    high_risk = [h["ward_name"] for h in current_data["hotspots"] if h["risk_level"] == "High"]
+    high_risk = _high_risk_names(current_data["hotspots"], current_data["user_reports"])
     return jsonify({
         "areas": high_risk,
         "count": len(high_risk),
@@ -217,31 +252,122 @@ def submit_report():
     
     if not data or "location" not in data:
         return jsonify({"error": "Location required"}), 400
+    if not isinstance(data["location"], str) or not data["location"].strip():
+        return jsonify({"error": "location must be a non-empty string"}), 400
+    if not isinstance(data.get("severity", "Medium"), str):
+        return jsonify({"error": "severity must be a string"}), 400
     
-    # Add report
-    report = report_manager.add_report(
-        location=data["location"],
-        severity=data.get("severity", "Medium"),
-        description=data.get("description", "")
-    )
+    # Add report through admission control (rate limit, dedup, bounded queue).
+    # The ingestion worker refreshes hotspots once per batch of reports.
+    try:
+        report, duplicate = admission.submit(
+            client_id=request.remote_addr or "unknown",
+            location=data["location"],
+            func=lambda: report_manager.add_report(
+                location=data["location"],
+                severity=data.get("severity", "Medium"),
+                description=data.get("description", ""),
+                save=False  # saved once per batch by _ingest_batch
+            )
+        )
+    except AdmissionRejected as e:
+        response = jsonify({"error": e.message, "retry_after": e.retry_after})
+        response.headers["Retry-After"] = str(e.retry_after)
+        return response, e.status
+    except IngestionFailed as e:
+        return jsonify({"error": "Report could not be processed", "detail": str(e)}), 500
     
-    # Trigger update to include new report
-    update_hotspots()
+    if report is None:
+        return jsonify({
+            "message": "Report queued for processing",
+            "added_to_map": False
+        }), 202
     
     return jsonify({
-        "message": "Report submitted successfully",
-        "report_id": report["report_id"],
-        "location": report["location"],
+        "message": "Duplicate report ignored" if duplicate else "Report submitted successfully",
+        "report_id": report.report_id,
+        "location": report.location,
         "coordinates": {
-            "latitude": report["latitude"],
-            "longitude": report["longitude"]
+            "latitude": report.latitude,
+            "longitude": report.longitude
         },
+        "duplicate": duplicate,
         "added_to_map": True
     })
 
+@app.route('/report-queue')
+def get_report_queue():
+    return jsonify(admission.stats())
+
 @app.route('/reports')
 def get_reports():
-    return jsonify(report_manager.get_active_reports(24))
+    return jsonify([report.to_dict() for report in report_manager.get_active_reports(24)])
+
+def _parse_bbox(value):
+    """Validate [min_lat, min_lon, max_lat, max_lon] (raises ValueError)"""
+    if (not isinstance(value, list) or len(value) != 4 or
+            not all(isinstance(v, (int, float)) and not isinstance(v, bool) for v in value)):
+        raise ValueError("bbox must be a list of 4 numbers [min_lat, min_lon, max_lat, max_lon]")
+    min_lat, min_lon, max_lat, max_lon = (float(v) for v in value)
+    if min_lat > max_lat or min_lon > max_lon:
+        raise ValueError("bbox minimums must not exceed maximums")
+    return (min_lat, min_lon, max_lat, max_lon)
+
+# NEW: Bulk moderation (verify / reject / expire many reports at once)
+@app.route('/reports/moderate', methods=['POST'])
+def moderate_reports():
+    if not MODERATION_TOKEN:
+        return jsonify({"error": "Moderation is disabled (MODERATION_TOKEN not set)"}), 403
+    if not hmac.compare_digest(request.headers.get("X-Moderation-Token", ""), MODERATION_TOKEN):
+        return jsonify({"error": "Invalid moderation token"}), 403
+    
+    data = request.get_json(silent=True)
+    
+    if not isinstance(data, dict) or data.get("action") not in MODERATION_ACTIONS:
+        return jsonify({"error": f"action must be one of {sorted(MODERATION_ACTIONS)}"}), 400
+    
+    # Either explicit IDs, or everything matching a bbox / time filter
+    if "report_ids" in data:
+        report_ids = data["report_ids"]
+        if not isinstance(report_ids, list) or not all(
+                isinstance(i, int) and not isinstance(i, bool) for i in report_ids):
+            return jsonify({"error": "report_ids must be a list of integers"}), 400
+    elif "filter" in data:
+        filters = data["filter"]
+        if not isinstance(filters, dict):
+            return jsonify({"error": "filter must be an object"}), 400
+        
+        # An empty filter would match every report - require it to be explicit,
+        # and never let "all" silently override a narrower filter
+        given = [k for k in ("bbox", "since", "until") if filters.get(k) is not None]
+        if "all" in filters:
+            if filters["all"] is not True or given:
+                return jsonify({"error": "\"all\" must be true and cannot be combined with bbox, since or until"}), 400
+            bbox = since = until = None
+        elif not given:
+            return jsonify({"error": "filter needs bbox, since or until (or \"all\": true)"}), 400
+        else:
+            try:
+                bbox = _parse_bbox(filters["bbox"]) if "bbox" in given else None
+                since = datetime.fromisoformat(filters["since"]) if "since" in given else None
+                until = datetime.fromisoformat(filters["until"]) if "until" in given else None
+            except (TypeError, ValueError) as e:
+                return jsonify({"error": f"Invalid filter: {e}"}), 400
+        
+        report_ids = report_manager.find_reports(bbox=bbox, since=since, until=until)
+    else:
+        return jsonify({"error": "report_ids or filter required"}), 400
+    
+    # One batch, one durable write, one hotspot refresh
+    result = report_manager.moderate_reports(report_ids, data["action"])
+    if result["updated"]:
+        update_hotspots()
+    
+    return jsonify({
+        **result,
+        "updated_count": len(result["updated"]),
+        "timestamp": datetime.now().isoformat()
+    })
 
 # NEW: Get prediction for specific location
 @app.route('/predict-location', methods=['POST'])
@@ -300,4 +426,4 @@ if __name__ == '__main__':
     print("\n🚀 Server: http://localhost:8000")
     print("="*60)
     
-    app.run(host='0.0.0.0', port=8000, debug=True)
\ No newline at end of file
+    app.run(host='0.0.0.0', port=8000, debug=True, threaded=True)
\ No newline at end of file
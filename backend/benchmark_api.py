@@ -0,0 +1,428 @@
+# backend/benchmark_api.py
+"""Load-test / benchmark suite for the Flask API.
+
+Drives `app` through Flask's test client and through a real local werkzeug
+server, with the geocoder and weather API replaced by local stubs (no network).
+
+For each synthetic report archive size it measures:
+  - update_hotspots(), get_active_reports() and serialize_hotspots() directly
+    (the last is the uncached /hotspots body build)
+  - mixed reads (/hotspots, /predictions, /high-risk-areas) at rising concurrency;
+    /hotspots is served from the per-update cache here, so these are cache hits
+  - a write burst on POST /report (drained before moving on; 200 = ingested
+    in-request, 202 = queued, throughput counts writes actually completed)
+
+and reports throughput, p50/p95/p99 latency and RSS per scenario.
+
+Separately, once and at a fixed size (--memory-size, 0 to skip), it measures
+heap bytes per report as JSON dicts vs compact ReportRecords, both decoded
+from the same JSON text like user_reports.json is on startup.
+
+Usage (from backend/):
+    python benchmark_api.py
+    python benchmark_api.py --sizes 1000,100000,1000000 --out bench_results.json
+"""
+import argparse
+import hashlib
+import json
+import logging
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from http.client import HTTPConnection
+from types import SimpleNamespace
+from typing import Callable, Dict, List, Optional, Tuple
+
+from werkzeug.serving import make_server
+
+try:
+    import resource  # Unix only
+except ImportError:
+    resource = None
+
+from admission_control import admission
+from app import app, serialize_hotspots, update_hotspots
+from models import ReportRecord
+from predictive_engine import predictor
+from user_reports import report_manager
+
+READ_PATHS = ["/hotspots", "/predictions", "/high-risk-areas"]
+SEVERITIES = ["Low", "Medium", "High"]
+
+
+# ============ STUBS ============
+
+class StubGeocoder:
+    """Deterministic offline replacement for Nominatim"""
+
+    def geocode(self, query: str, timeout: Optional[int] = None):
+        digest = hashlib.md5(query.encode()).digest()
+        return SimpleNamespace(
+            latitude=28.5 + digest[0] / 255 * 0.25,
+            longitude=77.05 + digest[1] / 255 * 0.3,
+            address=f"{query} (stub)"
+        )
+
+
+def stub_rainfall() -> Dict:
+    """Fixed heavy-rain reading instead of the OpenWeatherMap call"""
+    return {
+        "rainfall_mm": 60.0,
+        "humidity": 85,
+        "pressure": 1008,
+        "timestamp": datetime.now().isoformat(),
+        "source": "benchmark_stub"
+    }
+
+
+def install_stubs(workdir: str):
+    """Stub out network calls and keep every file write inside `workdir`"""
+    report_manager.geolocator = StubGeocoder()
+    report_manager.reports_file = os.path.join(workdir, "user_reports.json")
+    predictor.get_real_rainfall_data = stub_rainfall
+    # update_hotspots writes data.json relative to the cwd on the hour;
+    # never let it overwrite the tracked backend/data.json
+    os.chdir(workdir)
+
+
+def synthetic_report_dicts(size: int, seed: int = 42) -> List[Dict]:
+    """`size` synthetic reports in their JSON-file form.
+
+    Timestamps are spread over the last 72 hours, so roughly a third fall in
+    the 24-hour active window.
+    """
+    rng = random.Random(seed)
+    now = datetime.now()
+    reports = []
+    for report_id in range(1, size + 1):
+        reports.append({
+            "report_id": report_id,
+            "location": f"Synthetic Area {report_id % 5000}",
+            "severity": rng.choice(SEVERITIES),
+            "description": "",
+            "latitude": 28.5 + rng.random() * 0.25,
+            "longitude": 77.05 + rng.random() * 0.3,
+            "address": "Synthetic, Delhi",
+            "reported_at": (now - timedelta(seconds=rng.random() * 72 * 3600)).isoformat(),
+            "verified": False,
+            "status": "active" if rng.random() < 0.9 else "expired"
+        })
+    return reports
+
+
+def load_synthetic_archive(size: int):
+    """Replace the in-memory report store with `size` synthetic reports.
+
+    Goes through a JSON round trip so strings are not shared the way Python
+    literals are, matching what load_reports() gets from user_reports.json.
+    """
+    text = json.dumps(synthetic_report_dicts(size))
+    reports = [ReportRecord.from_dict(r) for r in json.loads(text)]
+
+    with report_manager.lock:
+        report_manager.reports = reports
+        report_manager.reports_by_id = {r.report_id: r for r in reports}
+        report_manager.next_id = size + 1
+
+
+# ============ MEASUREMENT ============
+
+def current_rss_mb() -> float:
+    """Resident set size of this process in MB"""
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    if resource is None:
+        return 0.0
+    # Peak RSS (KB on Linux, bytes on macOS) when /proc is unavailable
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def percentile(sorted_values: List[float], pct: float) -> float:
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, int(round(pct / 100 * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+def summarize(name: str, latencies: List[float], elapsed: float, statuses: Dict[int, int], **extra) -> Dict:
+    latencies = sorted(latencies)
+    return {
+        "scenario": name,
+        **extra,
+        "requests": len(latencies),
+        "elapsed_s": round(elapsed, 3),
+        "throughput_rps": round(len(latencies) / elapsed, 1) if elapsed else 0,
+        "latency_ms": {
+            "p50": round(percentile(latencies, 50) * 1000, 2),
+            "p95": round(percentile(latencies, 95) * 1000, 2),
+            "p99": round(percentile(latencies, 99) * 1000, 2),
+            "max": round(latencies[-1] * 1000, 2) if latencies else 0
+        },
+        "statuses": {str(code): count for code, count in sorted(statuses.items())},
+        "rss_mb": round(current_rss_mb(), 1)
+    }
+
+
+def run_load(send: Callable[[int], int], total: int, concurrency: int) -> Tuple[List[float], float, Dict[int, int]]:
+    """Call send(i) `total` times from `concurrency` threads"""
+    latencies: List[float] = []
+    statuses: Dict[int, int] = {}
+    lock = threading.Lock()
+
+    def one(i: int):
+        started = time.perf_counter()
+        try:
+            status = send(i)
+        except Exception:
+            status = 0  # connection error
+        took = time.perf_counter() - started
+        with lock:
+            latencies.append(took)
+            statuses[status] = statuses.get(status, 0) + 1
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        list(pool.map(one, range(total)))
+    return latencies, time.perf_counter() - started, statuses
+
+
+def measure_model_memory(size: int) -> Dict:
+    """Heap bytes retained by `size` reports as JSON dicts vs ReportRecords.
+
+    Both are decoded from the same JSON text, so every report gets its own
+    string objects (as when loading user_reports.json) instead of sharing the
+    generator's literals.
+    """
+    text = json.dumps(synthetic_report_dicts(size))
+    tracemalloc.start()
+    try:
+        base = tracemalloc.get_traced_memory()[0]
+        as_dicts = json.loads(text)
+        dict_bytes = tracemalloc.get_traced_memory()[0] - base
+        del as_dicts
+
+        base = tracemalloc.get_traced_memory()[0]
+        as_records = [ReportRecord.from_dict(r) for r in json.loads(text)]
+        record_bytes = tracemalloc.get_traced_memory()[0] - base
+        del as_records
+    finally:
+        tracemalloc.stop()
+
+    return {
+        "scenario": "model_memory",
+        "archive_size": size,
+        "dict_bytes": dict_bytes,
+        "record_bytes": record_bytes,
+        "bytes_per_report": {
+            "dict": round(dict_bytes / size, 1) if size else 0,
+            "record": round(record_bytes / size, 1) if size else 0
+        },
+        "saving_pct": round(100 * (1 - record_bytes / dict_bytes), 1) if dict_bytes else 0,
+        "rss_mb": round(current_rss_mb(), 1)
+    }
+
+
+def time_call(name: str, func: Callable, repeats: int, **extra) -> Dict:
+    latencies = []
+    started = time.perf_counter()
+    for _ in range(repeats):
+        t = time.perf_counter()
+        func()
+        latencies.append(time.perf_counter() - t)
+    return summarize(name, latencies, time.perf_counter() - started, {}, **extra)
+
+
+# ============ TRANSPORTS ============
+
+class TestClientTransport:
+    """Flask test client, one per worker thread"""
+    name = "test_client"
+
+    def __init__(self):
+        self.local = threading.local()
+
+    def request(self, method: str, path: str, body: Optional[Dict] = None, client_ip: str = "127.0.0.1") -> int:
+        client = getattr(self.local, "client", None)
+        if client is None:
+            client = self.local.client = app.test_client()
+        response = client.open(path, method=method, json=body,
+                               environ_base={"REMOTE_ADDR": client_ip})
+        return response.status_code
+
+
+class HTTPTransport:
+    """Real local werkzeug server on an ephemeral port"""
+    name = "http"
+
+    def __init__(self):
+        logging.getLogger("werkzeug").setLevel(logging.ERROR)  # no per-request access log
+        self.server = make_server("127.0.0.1", 0, app, threaded=True)
+        self.port = self.server.server_port
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self.thread.start()
+
+    def request(self, method: str, path: str, body: Optional[Dict] = None, client_ip: str = "127.0.0.1") -> int:
+        conn = HTTPConnection("127.0.0.1", self.port, timeout=60)
+        try:
+            headers = {"Content-Type": "application/json"} if body is not None else {}
+            conn.request(method, path, body=json.dumps(body) if body is not None else None, headers=headers)
+            response = conn.getresponse()
+            response.read()
+            return response.status
+        finally:
+            conn.close()
+
+    def close(self):
+        self.server.shutdown()
+
+
+# ============ SCENARIOS ============
+
+def bench_archive(size: int, args, transports) -> List[Dict]:
+    results = []
+    load_synthetic_archive(size)
+    print(f"\n📦 Archive: {size:,} reports (RSS {current_rss_mb():.0f} MB)")
+
+    results.append(time_call("get_active_reports", lambda: report_manager.get_active_reports(24),
+                             args.repeats, archive_size=size))
+    results.append(time_call("update_hotspots", update_hotspots, args.repeats, archive_size=size))
+    # Cold /hotspots cost: mixed_reads below only ever hit the cached body
+    results.append(time_call("hotspots_serialize", serialize_hotspots, args.repeats, archive_size=size))
+
+    for transport in transports:
+        for concurrency in args.concurrency:
+            latencies, elapsed, statuses = run_load(
+                lambda i: transport.request("GET", READ_PATHS[i % len(READ_PATHS)]),
+                args.read_requests, concurrency
+            )
+            results.append(summarize("mixed_reads", latencies, elapsed, statuses,
+                                     archive_size=size, transport=transport.name, concurrency=concurrency))
+
+    if size <= args.max_write_archive:
+        # Writes go through the test client so each request can carry its own
+        # client address (one per request, so per-client rate limits don't apply)
+        writer = transports[0]
+        latencies, elapsed, statuses = run_load(
+            lambda i: writer.request("POST", "/report",
+                                     {"location": f"Burst Area {size}-{i}", "severity": SEVERITIES[i % 3]},
+                                     client_ip=f"10.{(i >> 16) & 255}.{(i >> 8) & 255}.{i & 255}"),
+            args.write_requests, args.write_concurrency
+        )
+        # 202s are still queued or running - let them finish so they don't
+        # spill into (and rewrite) the next archive's scenarios
+        drain_started = time.perf_counter()
+        admission.drain()
+        drain_s = time.perf_counter() - drain_started
+
+        ingested = statuses.get(200, 0)
+        queued = statuses.get(202, 0)
+        result = summarize("write_burst", latencies, elapsed, statuses, archive_size=size,
+                           transport=writer.name, concurrency=args.write_concurrency)
+        result.update({
+            # Writes actually persisted per second, including the drain time
+            "throughput_rps": round((ingested + queued) / (elapsed + drain_s), 1) if elapsed + drain_s else 0,
+            "ingested_200": ingested,
+            "ingested_200_rps": round(ingested / elapsed, 1) if elapsed else 0,
+            "queued_202": queued,
+            "drain_s": round(drain_s, 3)
+        })
+        results.append(result)
+    else:
+        print(f"⏭️ Skipping write burst (archive > --max-write-archive {args.max_write_archive:,})")
+
+    for result in results:
+        print_result(result)
+    return results
+
+
+def print_memory_result(result: Dict):
+    per_report = result["bytes_per_report"]
+    print(f"\n🧮 Model memory ({result['archive_size']:,} reports): dict {per_report['dict']} B/report, "
+          f"record {per_report['record']} B/report, saving {result['saving_pct']}%")
+
+
+def print_result(result: Dict):
+    label = result["scenario"]
+    if "transport" in result:
+        label += f" [{result['transport']} x{result['concurrency']}]"
+    lat = result["latency_ms"]
+    print(f"  {label:<36} {result['throughput_rps']:>9} req/s  "
+          f"p50 {lat['p50']:>8}ms  p99 {lat['p99']:>8}ms  RSS {result['rss_mb']:>7} MB  {result['statuses']}")
+
+
+def parse_int_list(value: str) -> List[int]:
+    return [int(v) for v in value.split(",") if v]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the waterlogging Flask API")
+    parser.add_argument("--sizes", type=parse_int_list, default=[1000, 100000, 1000000],
+                        help="synthetic report archive sizes (comma separated)")
+    parser.add_argument("--concurrency", type=parse_int_list, default=[1, 4, 16, 64],
+                        help="read concurrency levels (comma separated)")
+    parser.add_argument("--read-requests", type=int, default=600)
+    parser.add_argument("--write-requests", type=int, default=50)
+    parser.add_argument("--write-concurrency", type=int, default=16)
+    parser.add_argument("--repeats", type=int, default=5, help="repeats for direct function timings")
+    parser.add_argument("--max-write-archive", type=int, default=100000,
+                        help="skip write bursts above this archive size (every write rewrites the file)")
+    parser.add_argument("--memory-size", type=int, default=100000,
+                        help="report count for the one-off dict vs record memory measurement (0 to skip)")
+    parser.add_argument("--no-http", action="store_true", help="only use the Flask test client")
+    parser.add_argument("--out", default="bench_results.json", help="machine-readable results file")
+    args = parser.parse_args(argv)
+    out_path = os.path.abspath(args.out)  # resolved before install_stubs changes the cwd
+
+    workdir = tempfile.mkdtemp(prefix="waterlogging_bench_")
+    install_stubs(workdir)
+
+    transports = [TestClientTransport()]
+    if not args.no_http:
+        transports.append(HTTPTransport())
+
+    print("🏁 Waterlogging API benchmark")
+    print("="*60)
+
+    # Runs under tracemalloc, so do it once, before any archive is loaded,
+    # and keep it out of the latency/RSS scenarios
+    memory = None
+    if args.memory_size > 0:
+        memory = measure_model_memory(args.memory_size)
+        print_memory_result(memory)
+
+    results = []
+    try:
+        for size in args.sizes:
+            results.extend(bench_archive(size, args, transports))
+    finally:
+        for transport in transports:
+            if hasattr(transport, "close"):
+                transport.close()
+
+    with open(out_path, "w") as f:
+        json.dump({
+            "generated_at": datetime.now().isoformat(),
+            "python": sys.version.split()[0],
+            "config": {k: v for k, v in vars(args).items() if k != "out"},
+            "memory": memory,
+            "results": results
+        }, f, indent=2)
+
+    print("="*60)
+    print(f"📝 Results written to {out_path}")
+
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
@@ -0,0 +1,176 @@
+# backend/models.py
+"""Compact in-memory records for reports and hotspots.
+
+Reports and hotspots used to be held as ~15-key dicts with repeated strings
+and ISO timestamp strings. These `__slots__` records keep the same data with
+no per-instance dict, enum members for risk level / source / status and
+float epoch timestamps. JSON dicts are only built by `to_dict()` at the
+serialization boundary (API responses and the JSON files).
+"""
+import sys
+from datetime import datetime
+from enum import Enum
+from typing import Dict, Optional
+
+
+class RiskLevel(Enum):
+    LOW = "Low"
+    MEDIUM = "Medium"
+    HIGH = "High"
+
+
+class Source(Enum):
+    PREDICTIVE_ENGINE = "predictive_engine"
+    USER_REPORT = "user_report"
+
+
+class ReportStatus(Enum):
+    ACTIVE = "active"
+    VERIFIED = "verified"
+    REJECTED = "rejected"
+    EXPIRED = "expired"
+
+
+def parse_timestamp(value: str) -> float:
+    """ISO timestamp string -> epoch seconds"""
+    return datetime.fromisoformat(value.replace('Z', '+00:00')).timestamp()
+
+
+def format_timestamp(ts: float) -> str:
+    """Epoch seconds -> ISO timestamp string (local time, like datetime.now())"""
+    return datetime.fromtimestamp(ts).isoformat()
+
+
+class ReportRecord:
+    """One user report"""
+    __slots__ = ("report_id", "location", "severity", "description", "latitude",
+                 "longitude", "address", "reported_ts", "verified", "status")
+
+    def __init__(self, report_id: int, location: str, severity: str, description: str,
+                 latitude: float, longitude: float, address: str, reported_ts: float,
+                 verified: bool = False, status: ReportStatus = ReportStatus.ACTIVE):
+        self.report_id = report_id
+        self.location = location
+        # Only a handful of distinct values, so share one string per value
+        self.severity = sys.intern(severity)
+        self.description = description
+        self.latitude = latitude
+        self.longitude = longitude
+        self.address = address
+        self.reported_ts = reported_ts
+        self.verified = verified
+        self.status = status
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> "ReportRecord":
+        return cls(
+            report_id=data["report_id"],
+            location=data["location"],
+            severity=data["severity"],
+            description=data.get("description", ""),
+            latitude=data["latitude"],
+            longitude=data["longitude"],
+            address=data.get("address", ""),
+            reported_ts=parse_timestamp(data["reported_at"]),
+            verified=data.get("verified", False),
+            status=ReportStatus(data.get("status", "active"))
+        )
+
+    def to_dict(self) -> Dict:
+        return {
+            "report_id": self.report_id,
+            "location": self.location,
+            "severity": self.severity,
+            "description": self.description,
+            "latitude": self.latitude,
+            "longitude": self.longitude,
+            "address": self.address,
+            "reported_at": format_timestamp(self.reported_ts),
+            "verified": self.verified,
+            "status": self.status.value
+        }
+
+    @property
+    def risk_level(self) -> RiskLevel:
+        """Risk level of the map hotspot this report produces"""
+        return RiskLevel.HIGH if "High" in self.severity else RiskLevel.MEDIUM
+
+    def to_hotspot_dict(self, hotspot_id: int, rainfall_mm: float) -> Dict:
+        """Serialize as a user-reported hotspot.
+
+        User-report hotspots are built straight from the report record at the
+        serialization boundary, so no second object is kept per report.
+        """
+        reported_at = format_timestamp(self.reported_ts)
+        high = self.risk_level is RiskLevel.HIGH
+        return {
+            "id": hotspot_id,
+            "ward_name": self.location,
+            "ward_code": "UR",  # User Reported
+            "latitude": self.latitude,
+            "longitude": self.longitude,
+            "risk_level": self.risk_level.value,
+            "severity_score": 8 if high else 5,
+            "last_incident": reported_at[:10],
+            "rainfall_mm": rainfall_mm,
+            "drainage_status": "Unknown",
+            "preparedness_score": 3,
+            "prediction_confidence": 70,
+            "will_waterlog": True,
+            "last_updated": reported_at,
+            "data_source": Source.USER_REPORT.value,
+            "report_id": self.report_id,
+            "description": self.description or ""
+        }
+
+
+class HotspotRecord:
+    """One predicted-area map hotspot (user reports serialize themselves)"""
+    __slots__ = ("id", "ward_name", "ward_code", "latitude", "longitude", "risk_level",
+                 "severity_score", "last_incident", "rainfall_mm", "drainage_status",
+                 "preparedness_score", "prediction_confidence", "will_waterlog",
+                 "last_updated_ts", "source", "elevation_m")
+
+    def __init__(self, id: int, ward_name: str, ward_code: str, latitude: float, longitude: float,
+                 risk_level: RiskLevel, severity_score: int, last_incident: str,
+                 rainfall_mm: float, drainage_status: str, preparedness_score: int,
+                 prediction_confidence: int, will_waterlog: bool, last_updated_ts: float,
+                 source: Source = Source.PREDICTIVE_ENGINE, elevation_m: Optional[int] = None):
+        self.id = id
+        self.ward_name = ward_name
+        self.ward_code = ward_code
+        self.latitude = latitude
+        self.longitude = longitude
+        self.risk_level = risk_level
+        self.severity_score = severity_score
+        self.last_incident = last_incident
+        self.rainfall_mm = rainfall_mm
+        self.drainage_status = drainage_status
+        self.preparedness_score = preparedness_score
+        self.prediction_confidence = prediction_confidence
+        self.will_waterlog = will_waterlog
+        self.last_updated_ts = last_updated_ts
+        self.source = source
+        self.elevation_m = elevation_m
+
+    def to_dict(self) -> Dict:
+        data = {
+            "id": self.id,
+            "ward_name": self.ward_name,
+            "ward_code": self.ward_code,
+            "latitude": self.latitude,
+            "longitude": self.longitude,
+            "risk_level": self.risk_level.value,
+            "severity_score": self.severity_score,
+            "last_incident": self.last_incident,
+            "rainfall_mm": self.rainfall_mm,
+            "drainage_status": self.drainage_status,
+            "preparedness_score": self.preparedness_score,
+            "prediction_confidence": self.prediction_confidence,
+            "will_waterlog": self.will_waterlog,
+            "last_updated": format_timestamp(self.last_updated_ts),
+            "data_source": self.source.value
+        }
+        if self.elevation_m is not None:
+            data["elevation_m"] = self.elevation_m
+        return data
\ No newline at end of file
@@ -3,6 +3,7 @@ import requests
 import json
 from datetime import datetime, timedelta
 import math
+import random
 from typing import Dict, List, Tuple
 import os
 
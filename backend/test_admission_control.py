@@ -0,0 +1,151 @@
+# backend/test_admission_control.py
+import threading
+
+import pytest
+
+from admission_control import AdmissionRejected, IngestionFailed, ReportAdmissionController
+
+
+def make_controller(**kwargs):
+    options = dict(rate_per_minute=6000, burst=100, queue_size=4,
+                   dedup_window=60, wait_timeout=5)
+    options.update(kwargs)
+    return ReportAdmissionController(**options)
+
+
+def blocking_job(started: threading.Event, release: threading.Event, result=None):
+    def func():
+        started.set()
+        release.wait(5)
+        return result or {"ok": True}
+    return func
+
+
+def submit_in_thread(controller, client_id, location, func):
+    out = {}
+
+    def run():
+        try:
+            out["result"] = controller.submit(client_id, location, func)
+        except Exception as e:
+            out["error"] = e
+
+    thread = threading.Thread(target=run)
+    thread.start()
+    return thread, out
+
+
+def test_submit_runs_job_and_batch_hook():
+    controller = make_controller()
+    batches = []
+    controller.on_batch = lambda: batches.append(1)
+
+    result, duplicate = controller.submit("c1", "ITO", lambda: {"report_id": 1})
+
+    assert result == {"report_id": 1}
+    assert duplicate is False
+    assert batches == [1]
+
+
+def test_token_bucket_rejects_with_retry_after():
+    controller = make_controller(rate_per_minute=6, burst=2)
+
+    controller.submit("c1", "A", lambda: {})
+    controller.submit("c1", "B", lambda: {})
+    with pytest.raises(AdmissionRejected) as exc:
+        controller.submit("c1", "C", lambda: {})
+
+    assert exc.value.status == 429
+    assert exc.value.retry_after >= 1
+    # Other clients have their own bucket
+    controller.submit("c2", "C", lambda: {})
+
+
+def test_duplicate_returns_original_and_is_rate_limited():
+    controller = make_controller(rate_per_minute=6, burst=2)
+    calls = []
+
+    def func():
+        calls.append(1)
+        return {"report_id": 7}
+
+    assert controller.submit("c1", " ITO ", func) == ({"report_id": 7}, False)
+    assert controller.submit("c1", "ito", func) == ({"report_id": 7}, True)
+    assert len(calls) == 1
+
+    with pytest.raises(AdmissionRejected) as exc:
+        controller.submit("c1", "ITO", func)
+    assert exc.value.status == 429
+
+
+def test_duplicate_of_pending_job_does_not_block():
+    controller = make_controller()
+    started, release = threading.Event(), threading.Event()
+    thread, out = submit_in_thread(controller, "c1", "ITO", blocking_job(started, release))
+    assert started.wait(5)
+
+    assert controller.submit("c1", "ITO", lambda: {}) == (None, True)
+
+    release.set()
+    thread.join(5)
+    assert out["result"] == ({"ok": True}, False)
+
+
+def test_full_queue_rejects_with_503():
+    controller = make_controller(queue_size=1, max_waiters=0)
+    started, release = threading.Event(), threading.Event()
+
+    # First job is taken by the worker, second fills the one queue slot
+    assert controller.submit("c1", "A", blocking_job(started, release)) == (None, False)
+    assert started.wait(5)
+    assert controller.submit("c1", "B", lambda: {}) == (None, False)
+
+    with pytest.raises(AdmissionRejected) as exc:
+        controller.submit("c1", "C", lambda: {})
+    assert exc.value.status == 503
+    assert exc.value.retry_after >= 1
+
+    release.set()
+
+
+def test_waiters_are_capped():
+    controller = make_controller(max_waiters=1)
+    started, release = threading.Event(), threading.Event()
+    thread, out = submit_in_thread(controller, "c1", "A", blocking_job(started, release))
+    assert started.wait(5)
+
+    # The only waiter slot is taken, so this returns "queued" immediately
+    assert controller.submit("c2", "B", lambda: {"report_id": 2}) == (None, False)
+    assert controller.stats()["waiting"] == 1
+
+    release.set()
+    thread.join(5)
+    assert out["result"] == ({"ok": True}, False)
+
+
+def test_failed_job_is_not_replayed_to_retries():
+    controller = make_controller()
+
+    def broken():
+        raise RuntimeError("disk full")
+
+    with pytest.raises(IngestionFailed):
+        controller.submit("c1", "ITO", broken)
+
+    # The retry is processed again rather than answered from the dedup cache
+    assert controller.submit("c1", "ITO", lambda: {"report_id": 1}) == ({"report_id": 1}, False)
+
+
+def test_batch_hook_failure_fails_jobs():
+    controller = make_controller()
+
+    def broken_batch():
+        raise OSError("cannot save")
+
+    controller.on_batch = broken_batch
+
+    with pytest.raises(IngestionFailed):
+        controller.submit("c1", "ITO", lambda: {"report_id": 1})
+
+    controller.on_batch = None
+    assert controller.submit("c1", "ITO", lambda: {"report_id": 2}) == ({"report_id": 2}, False)
\ No newline at end of file
@@ -0,0 +1,130 @@
+# backend/test_moderation.py
+import json
+import time
+
+import pytest
+
+import app as app_module
+from models import ReportRecord, ReportStatus
+from predictive_engine import predictor
+from user_reports import report_manager
+
+TOKEN = "test-token"
+HEADERS = {"X-Moderation-Token": TOKEN}
+
+
+@pytest.fixture
+def client(tmp_path, monkeypatch):
+    """Test client over 10 reports (IDs 1-10, latitude 28.50-28.59) in a temp dir"""
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(app_module, "MODERATION_TOKEN", TOKEN)
+    monkeypatch.setattr(predictor, "get_real_rainfall_data", lambda: {
+        "rainfall_mm": 60.0, "humidity": 85, "pressure": 1008,
+        "timestamp": "2026-01-01T00:00:00", "source": "test"
+    })
+    monkeypatch.setattr(report_manager, "reports_file", str(tmp_path / "user_reports.json"))
+
+    now = time.time()
+    reports = [
+        ReportRecord(report_id=i, location=f"Area {i}", severity="High", description="",
+                     latitude=28.5 + i / 100, longitude=77.2, address="Delhi",
+                     reported_ts=now - i * 3600)
+        for i in range(1, 11)
+    ]
+    monkeypatch.setattr(report_manager, "reports", reports)
+    monkeypatch.setattr(report_manager, "reports_by_id", {r.report_id: r for r in reports})
+    monkeypatch.setattr(report_manager, "next_id", 11)
+
+    saves = []
+    original_save = report_manager.save_reports
+
+    def counting_save():
+        saves.append(1)
+        original_save()
+
+    monkeypatch.setattr(report_manager, "save_reports", counting_save)
+
+    test_client = app_module.app.test_client()
+    test_client.saves = saves
+    return test_client
+
+
+def moderate(client, body, headers=HEADERS):
+    return client.post("/reports/moderate", json=body, headers=headers)
+
+
+def statuses():
+    return {r.report_id: r.status for r in report_manager.reports}
+
+
+def test_requires_token(client, monkeypatch):
+    assert moderate(client, {"action": "verify", "report_ids": [1]}, headers={}).status_code == 403
+    assert moderate(client, {"action": "verify", "report_ids": [1]},
+                    headers={"X-Moderation-Token": "wrong"}).status_code == 403
+
+    monkeypatch.setattr(app_module, "MODERATION_TOKEN", "")
+    assert moderate(client, {"action": "verify", "report_ids": [1]}).status_code == 403
+    assert client.saves == []
+
+
+def test_report_ids_batch_uses_one_save(client):
+    response = moderate(client, {"action": "reject", "report_ids": [1, 2, 3, 99]})
+
+    assert response.status_code == 200
+    body = response.get_json()
+    assert body["updated"] == [1, 2, 3]
+    assert body["missing"] == [99]
+    assert client.saves == [1]
+
+    saved = json.load(open(report_manager.reports_file))
+    assert [r["status"] for r in saved[:4]] == ["rejected", "rejected", "rejected", "active"]
+
+
+def test_verified_reports_stay_on_map(client):
+    moderate(client, {"action": "verify", "report_ids": [1, 2]})
+
+    assert statuses()[1] is ReportStatus.VERIFIED
+    report_ids = {h.get("report_id") for h in client.get("/hotspots").get_json()}
+    assert {1, 2} <= report_ids
+
+
+def test_bbox_filter(client):
+    response = moderate(client, {"action": "expire",
+                                 "filter": {"bbox": [28.5, 77.0, 28.535, 77.5]}})
+
+    assert response.status_code == 200
+    assert response.get_json()["updated"] == [1, 2, 3]
+    assert client.saves == [1]
+
+
+def test_all_filter(client):
+    response = moderate(client, {"action": "expire", "filter": {"all": True}})
+
+    assert response.get_json()["updated_count"] == 10
+    assert set(statuses().values()) == {ReportStatus.EXPIRED}
+
+
+@pytest.mark.parametrize("body", [
+    {"action": "delete", "report_ids": [1]},
+    {"action": "expire"},
+    {"action": "expire", "report_ids": [1, True]},
+    {"action": "expire", "report_ids": "1"},
+    {"action": "expire", "filter": {}},
+    {"action": "expire", "filter": [1]},
+    {"action": "expire", "filter": {"all": False}},
+    {"action": "expire", "filter": {"all": True, "bbox": [28, 77, 29, 78]}},
+    {"action": "expire", "filter": {"all": True, "since": "2020-01-01"}},
+    {"action": "expire", "filter": {"bbox": "1234"}},
+    {"action": "expire", "filter": {"bbox": ["a", "b", "c", "d"]}},
+    {"action": "expire", "filter": {"bbox": [29, 77, 28, 78]}},
+    {"action": "expire", "filter": {"bbox": [28, 77, 29]}},
+    {"action": "expire", "filter": {"since": 5}},
+    {"action": "expire", "filter": {"until": "yesterday"}},
+])
+def test_invalid_requests_rejected(client, body):
+    response = moderate(client, body)
+
+    assert response.status_code == 400
+    assert "error" in response.get_json()
+    assert client.saves == []
+    assert set(statuses().values()) == {ReportStatus.ACTIVE}
\ No newline at end of file
@@ -1,9 +1,23 @@
 # backend/user_reports.py
 import json
+import os
+import random
+import threading
 from datetime import datetime
 from geopy.geocoders import Nominatim
-from typing import Dict, List, Optional
+from typing import Dict, Iterable, List, Optional, Tuple
 import time
+from models import ReportRecord, ReportStatus
+
+# Moderation action -> (verified flag, new status)
+MODERATION_ACTIONS = {
+    "verify": (True, ReportStatus.VERIFIED),
+    "reject": (False, ReportStatus.REJECTED),
+    "expire": (None, ReportStatus.EXPIRED)
+}
+
+# Statuses that still show up on the map (verifying a report must not hide it)
+VISIBLE_STATUSES = (ReportStatus.ACTIVE, ReportStatus.VERIFIED)
 
 class UserReportManager:
     """Manages real user-reported waterlogging locations"""
@@ -11,20 +25,31 @@ class UserReportManager:
     def __init__(self):
         self.geolocator = Nominatim(user_agent="delhi_waterlogging_app")
         self.reports_file = "user_reports.json"
+        # Guards self.reports / self.reports_by_id and the reports file
+        self.lock = threading.RLock()
         self.load_reports()
     
     def load_reports(self):
         """Load existing user reports"""
         try:
             with open(self.reports_file, "r") as f:
-                self.reports = json.load(f)
+                self.reports = [ReportRecord.from_dict(r) for r in json.load(f)]
         except FileNotFoundError:
             self.reports = []
+        
+        # ID index so lookups don't scan the whole list
+        self.reports_by_id = {report.report_id: report for report in self.reports}
+        self.next_id = max(self.reports_by_id, default=0) + 1
     
     def save_reports(self):
-        """Save reports to file"""
-        with open(self.reports_file, "w") as f:
-            json.dump(self.reports, f, indent=2)
+        """Save reports to file (atomic replace, so a crash never leaves half a file)"""
+        with self.lock:
+            tmp_file = self.reports_file + ".tmp"
+            with open(tmp_file, "w") as f:
+                json.dump([report.to_dict() for report in self.reports], f, indent=2)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_file, self.reports_file)
     
     def geocode_location(self, location_name: str) -> Optional[Dict]:
         """Convert location name to coordinates"""
@@ -44,8 +69,9 @@ class UserReportManager:
         
         return None
     
-    def add_report(self, location: str, severity: str, description: str = "") -> Dict:
-        """Add a new user report"""
+    def add_report(self, location: str, severity: str, description: str = "",
+                   save: bool = True) -> ReportRecord:
+        """Add a new user report (save=False leaves persisting to the caller)"""
         
         # Geocode the location
         coords = self.geocode_location(location)
@@ -58,47 +84,100 @@ class UserReportManager:
                 "address": f"{location}, Delhi (approx)"
             }
         
-        report_id = len(self.reports) + 1
-        report = {
-            "report_id": report_id,
-            "location": location,
-            "severity": severity,
-            "description": description,
-            "latitude": coords["latitude"],
-            "longitude": coords["longitude"],
-            "address": coords["address"],
-            "reported_at": datetime.now().isoformat(),
-            "verified": False,
-            "status": "active"
-        }
-        
-        self.reports.append(report)
-        self.save_reports()
+        with self.lock:
+            report_id = self.next_id
+            self.next_id += 1
+            report = ReportRecord(
+                report_id=report_id,
+                location=location,
+                severity=severity,
+                description=description,
+                latitude=coords["latitude"],
+                longitude=coords["longitude"],
+                address=coords["address"],
+                reported_ts=time.time()
+            )
+            
+            self.reports.append(report)
+            self.reports_by_id[report_id] = report
+            if save:
+                self.save_reports()
         
         return report
     
-    def get_active_reports(self, hours: int = 24) -> List[Dict]:
+    def get_report(self, report_id: int) -> Optional[ReportRecord]:
+        """Look up a single report by ID"""
+        return self.reports_by_id.get(report_id)
+    
+    def get_active_reports(self, hours: int = 24) -> List[ReportRecord]:
         """Get reports from last X hours"""
-        cutoff = datetime.now() - timedelta(hours=hours)
+        cutoff = time.time() - hours * 3600
         
         active_reports = []
         for report in self.reports:
-            reported_time = datetime.fromisoformat(report["reported_at"].replace('Z', '+00:00'))
-            if reported_time >= cutoff and report["status"] == "active":
+            if report.reported_ts >= cutoff and report.status in VISIBLE_STATUSES:
                 active_reports.append(report)
         
         return active_reports
     
-    def verify_report(self, report_id: int, verified: bool = True):
-        """Verify a user report"""
+    def find_reports(self, bbox: Optional[Tuple[float, float, float, float]] = None,
+                     since: Optional[datetime] = None,
+                     until: Optional[datetime] = None) -> List[int]:
+        """IDs of reports inside bbox (min_lat, min_lon, max_lat, max_lon) and time range"""
+        since_ts = since.timestamp() if since else None
+        until_ts = until.timestamp() if until else None
+        
+        matched = []
         for report in self.reports:
-            if report["report_id"] == report_id:
-                report["verified"] = verified
-                if verified:
-                    report["status"] = "verified"
-                break
+            if bbox:
+                min_lat, min_lon, max_lat, max_lon = bbox
+                if not (min_lat <= report.latitude <= max_lat and
+                        min_lon <= report.longitude <= max_lon):
+                    continue
+            if since_ts is not None and report.reported_ts < since_ts:
+                continue
+            if until_ts is not None and report.reported_ts > until_ts:
+                continue
+            matched.append(report.report_id)
         
-        self.save_reports()
+        return matched
+    
+    def moderate_reports(self, report_ids: Iterable[int], action: str) -> Dict:
+        """Apply one moderation action to many reports with a single save"""
+        if action not in MODERATION_ACTIONS:
+            raise ValueError(f"Unknown moderation action: {action}")
+        verified, status = MODERATION_ACTIONS[action]
+        
+        updated = []
+        missing = []
+        with self.lock:
+            for report_id in report_ids:
+                report = self.get_report(report_id)
+                if report is None:
+                    missing.append(report_id)
+                    continue
+                if verified is not None:
+                    report.verified = verified
+                report.status = status
+                updated.append(report_id)
+            
+            if updated:
+                self.save_reports()
+        
+        return {"action": action, "updated": updated, "missing": missing}
+    
+    def verify_report(self, report_id: int, verified: bool = True):
+        """Verify a user report"""
+        with self.lock:
+            report = self.get_report(report_id)
+            if report is None:
+                return
+            
+            report.verified = verified
+            if verified:
+                report.status = ReportStatus.VERIFIED
+            
+            self.save_reports()
 
 # Singleton instance
 report_manager = UserReportManager()
\ No newline at end of file